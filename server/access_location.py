@@ -6,62 +6,34 @@ and IP-based geolocation. Client-side implementation should use Geolocation API.
 """
 
 import os
-import requests
+import httpx
+import ipaddress
+import threading
 from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
 from functools import lru_cache
 import json
-from pathlib import Path
+from cachetools import TTLCache
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
 class LocationCache:
-    """Simple file-based cache for location data."""
+    """Thread-safe in-memory cache for location data with TTL + LRU eviction."""
     
-    def __init__(self, cache_file: str = 'location_cache.json', ttl_minutes: int = 60):
-        self.cache_file = Path(cache_file)
-        self.ttl = timedelta(minutes=ttl_minutes)
+    def __init__(self, maxsize: int = 10000, ttl_minutes: int = 60):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl_minutes * 60)
+        self._lock = threading.RLock()
     
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached location data if not expired."""
-        if not self.cache_file.exists():
-            return None
-        
-        try:
-            with open(self.cache_file, 'r') as f:
-                cache_data = json.load(f)
-            
-            if key in cache_data:
-                entry = cache_data[key]
-                cached_time = datetime.fromisoformat(entry['timestamp'])
-                
-                if datetime.now() - cached_time < self.ttl:
-                    return entry['data']
-        except (json.JSONDecodeError, KeyError, ValueError):
-            pass
-        
-        return None
+        with self._lock:
+            return self._cache.get(key)
     
     def set(self, key: str, data: Dict[str, Any]):
         """Store location data in cache."""
-        cache_data = {}
-        
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    cache_data = json.load(f)
-            except json.JSONDecodeError:
-                pass
-        
-        cache_data[key] = {
-            'timestamp': datetime.now().isoformat(),
-            'data': data
-        }
-        
-        with open(self.cache_file, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+        with self._lock:
+            self._cache[key] = data
 
 
 class GeolocationService:
@@ -85,6 +57,12 @@ class GeolocationService:
     
     def __init__(self):
         self.cache = LocationCache()
+        # Shared HTTP/2 client so provider calls reuse pooled TLS connections
+        self._client = httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(5.0, connect=2.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
         self.ip_geolocation_apis = [
             'http://ip-api.com/json/',  # Free, no API key required
             'https://ipapi.co/json/',    # Free tier available
@@ -105,7 +83,7 @@ class GeolocationService:
             if ip_address:
                 url += ip_address
             
-            response = requests.get(url, timeout=5)
+            response = self._client.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -129,13 +107,13 @@ class GeolocationService:
                     self.cache.set(cache_key, location)
                     
                     return location
-        except requests.RequestException:
+        except (httpx.RequestError, ValueError):
             pass
         
         # Fallback to ipapi.co
         try:
             url = 'https://ipapi.co/json/'
-            response = requests.get(url, timeout=5)
+            response = self._client.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -158,7 +136,7 @@ class GeolocationService:
                     self.cache.set(cache_key, location)
                     
                     return location
-        except requests.RequestException:
+        except (httpx.RequestError, ValueError):
             pass
         
         return None
@@ -244,6 +222,15 @@ def access_location(ip_address: Optional[str] = None) -> Dict[str, Any]:
     return _geolocation_service.get_location(ip_address=ip_address)
 
 
+def _is_public(ip: str) -> bool:
+    """Check whether an IP address is publicly routable (worth geolocating)."""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return not (addr.is_private or addr.is_loopback or addr.is_link_local or addr.is_reserved)
+
+
 def get_location_from_request(request) -> Dict[str, Any]:
     """Extract location from Flask/FastAPI request object.
     
@@ -268,8 +255,8 @@ def get_location_from_request(request) -> Dict[str, Any]:
     if not ip_address and hasattr(request, 'remote_addr'):
         ip_address = request.remote_addr
     
-    # Filter out local/private IPs for better geolocation
-    if ip_address in ['127.0.0.1', 'localhost', '::1']:
+    # Filter out local/private/reserved IPs; providers cannot geolocate them
+    if ip_address and not _is_public(ip_address):
         ip_address = None
     
     return access_location(ip_address=ip_address)
@@ -52,6 +52,9 @@ cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
 retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
 openmeteo = openmeteo_requests.Client(session=retry_session)
 
+# Cached market trends older than this are refreshed from the scraper
+MARKET_TRENDS_MAX_AGE = 6 * 3600
+
 # --- API Endpoints ---
 
 @app.route('/', methods=['GET'])
@@ -211,8 +214,8 @@ def get_market_trends():
 
     try:
         # Check if we have cached data in database first
-        cached_data = db_manager.get_market_trends(commodity, state, market)
-        if cached_data:
+        cached_data, cached_age = db_manager.upsert_and_get_trends(commodity, state, market)
+        if cached_data and cached_age < MARKET_TRENDS_MAX_AGE:
             logger.info("Returning cached market trends data")
             db_manager.log_request('/api/market-trends', 'POST', 
                                 {'commodity': commodity, 'state': state, 'market': market}, 
@@ -232,7 +235,15 @@ def get_market_trends():
                                     200, trends, time.time() - start_time)
                 return jsonify(trends)
             except Exception as scraper_error:
-                logger.warning(f"Market scraper failed: {scraper_error}, falling back to mock data")
+                logger.warning(f"Market scraper failed: {scraper_error}, falling back to cached or mock data")
+        
+        # A stale entry is still real data; serve it rather than replacing it with mock data
+        if cached_data:
+            logger.info("Scraper unavailable, returning stale cached market trends data")
+            db_manager.log_request('/api/market-trends', 'POST', 
+                                {'commodity': commodity, 'state': state, 'market': market}, 
+                                200, cached_data, time.time() - start_time)
+            return jsonify(cached_data)
         
         # Fallback mock data when scraper is not available
         mock_data = {
@@ -383,4 +394,8 @@ def send_whatsapp_message():
 
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
+    # Werkzeug dev server for local work only. In production run the WSGI
+    # entrypoint instead (see wsgi.py):
+    #   gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5001 wsgi:app
+    debug = os.getenv('FLASK_ENV') == 'development'
+    app.run(debug=debug, port=5001, threaded=True)
@@ -1,293 +1,512 @@
 import sqlite3
-import json
+import orjson
 import os
+import atexit
+import queue
+import threading
+import time
+from cachetools import TTLCache
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from utils.logging import get_logger, log_exception, log_execution_time
 
 logger = get_logger(__name__)
 
+
+def _dumps(obj: Any) -> str:
+    """Serialize to a JSON string for a TEXT column"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+# Per-connection tuning; journal_mode=WAL is persistent and set once in init_database
+_CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA journal_size_limit=6144000',
+)
+
+# Seconds elapsed since a row's created_at, computed inside SQLite
+_AGE_SECONDS_SQL = "(julianday('now') - julianday(created_at)) * 86400.0 AS age_seconds"
+
+# Columns needed to rebuild a market trends response
+_TRENDS_COLUMNS = (
+    "commodity, state, market, latest_price, trend, percentage_change, "
+    "data_points_found, average_price, highest_price, lowest_price, prices_data, message"
+)
+
+_INSERT_REQUEST_LOG_SQL = '''
+    INSERT INTO request_logs (endpoint, method, parameters, response_status, response_data, execution_time)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Errors caused by the row itself (constraint or binding failures); retrying never helps
+_BAD_ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError)
+
 class DatabaseManager:
-    def __init__(self, db_name: str = "kisan_app.db"):
+    def __init__(self, db_name: str = "kisan_app.db", pool_size: int = 8,
+                 log_flush_interval: float = 1.0, log_batch_size: int = 500,
+                 log_retention_days: int = 7, log_prune_interval: float = 3600.0,
+                 log_buffer_limit: int = 10000):
         # Get the absolute path to the directory where this script is located
         script_dir = os.path.dirname(os.path.abspath(__file__))
         # Join the script directory with the database name
         self.db_path = os.path.join(script_dir, db_name)
+        
+        # WAL allows one writer alongside many readers: share a single writer
+        # connection under a lock and hand out readers from a fixed pool
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
         self.init_database()
+        
+        # Hot-key memo for the "latest row" getters; entries are refreshed or
+        # dropped by the matching store_* call in this process
+        self._cache_lock = threading.Lock()
+        self._trends_cache = TTLCache(maxsize=512, ttl=300)
+        self._schemes_cache = TTLCache(maxsize=512, ttl=300)
+        
+        self._pool = queue.Queue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        
+        # Request logs are buffered and written in batches off the request path
+        self._log_buffer = deque()
+        self._log_lock = threading.Lock()
+        self._log_batch_size = log_batch_size
+        self._log_buffer_limit = log_buffer_limit
+        self._log_flush_interval = log_flush_interval
+        self._log_wakeup = threading.Event()
+        self._log_retention_days = log_retention_days
+        self._log_prune_interval = log_prune_interval
+        threading.Thread(target=self._log_flush_loop, name='db-log-flusher', daemon=True).start()
+        atexit.register(self._flush_logs)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a long-lived connection with the tuned PRAGMAs applied"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _get_conn(self, write: bool = False):
+        """Borrow a pooled connection; writes commit on exit or roll back on error"""
+        if write:
+            with self._write_lock:
+                try:
+                    yield self._writer
+                    self._writer.commit()
+                except Exception:
+                    self._writer.rollback()
+                    raise
+        else:
+            conn = self._pool.get()
+            try:
+                yield conn
+            finally:
+                self._pool.put(conn)
     
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._get_conn(write=True) as conn:
+            # WAL lets readers proceed while a writer appends; sticky once set
+            conn.execute('PRAGMA journal_mode=WAL')
+            cursor = conn.cursor()
+            
+            # Market trends table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS market_trends (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    commodity TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    market TEXT NOT NULL,
+                    latest_price REAL,
+                    trend TEXT,
+                    percentage_change REAL,
+                    data_points_found INTEGER,
+                    average_price REAL,
+                    highest_price REAL,
+                    lowest_price REAL,
+                    prices_data TEXT,
+                    message TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Market trends table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS market_trends (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                commodity TEXT NOT NULL,
-                state TEXT NOT NULL,
-                market TEXT NOT NULL,
-                latest_price REAL,
-                trend TEXT,
-                percentage_change REAL,
-                data_points_found INTEGER,
-                average_price REAL,
-                highest_price REAL,
-                lowest_price REAL,
-                prices_data TEXT,
-                message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # One market trends entry per key so refreshes can upsert in place.
+            # History is collapsed: older rows for a key are deleted permanently
+            # and only the newest is kept (a no-op once the unique index exists).
+            collapsed = cursor.execute('''
+                DELETE FROM market_trends WHERE id NOT IN (
+                    SELECT MAX(id) FROM market_trends GROUP BY commodity, state, market
+                )
+            ''').rowcount
+            if collapsed:
+                logger.warning("Removed %d older market_trends rows, keeping the latest per key", collapsed)
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_market_trends_key
+                ON market_trends(commodity, state, market)
+            ''')
         
-        # Government schemes table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS govt_schemes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                query TEXT NOT NULL,
-                schemes_data TEXT NOT NULL,
-                message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # Government schemes table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS govt_schemes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    query TEXT NOT NULL,
+                    schemes_data TEXT NOT NULL,
+                    message TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Weather data table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS weather_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                latitude REAL NOT NULL,
-                longitude REAL NOT NULL,
-                weather_info TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # Weather data table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS weather_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    latitude REAL NOT NULL,
+                    longitude REAL NOT NULL,
+                    weather_info TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Soil analysis table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS soil_analysis (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                latitude REAL NOT NULL,
-                longitude REAL NOT NULL,
-                soil_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # Soil analysis table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS soil_analysis (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    latitude REAL NOT NULL,
+                    longitude REAL NOT NULL,
+                    soil_data TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Crop analysis table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crop_analysis (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT NOT NULL,
-                query TEXT,
-                analysis_result TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # Crop analysis table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS crop_analysis (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filename TEXT NOT NULL,
+                    query TEXT,
+                    analysis_result TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Request logs table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS request_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                endpoint TEXT NOT NULL,
-                method TEXT NOT NULL,
-                parameters TEXT,
-                response_status INTEGER,
-                response_data TEXT,
-                execution_time REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # Request logs table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS request_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    endpoint TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    parameters TEXT,
+                    response_status INTEGER,
+                    response_data TEXT,
+                    execution_time REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Lookup indexes for the getters and request stats.
+            # market_trends lookups are already served by idx_market_trends_key.
+            # created_at has one-second resolution, so id breaks ties between
+            # stores in the same second; replaces the older (query, created_at) index
+            cursor.execute('DROP INDEX IF EXISTS idx_schemes_query')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_schemes_query_latest
+                ON govt_schemes(query, created_at DESC, id DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_logs_endpoint
+                ON request_logs(endpoint)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_logs_created
+                ON request_logs(created_at)
+            ''')
+            
+            # Refresh planner statistics where they are stale
+            cursor.execute('PRAGMA optimize')
         
-        conn.commit()
-        conn.close()
         logger.info("Database initialized successfully!")
     
-    @log_exception()
-    @log_execution_time()
     def log_request(self, endpoint: str, method: str, parameters: Dict = None, 
                    response_status: int = 200, response_data: Any = None, execution_time: float = 0):
-        """Log API request details"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO request_logs (endpoint, method, parameters, response_status, response_data, execution_time)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
+        """Queue API request details; rows are written by the background flusher"""
+        row = (
             endpoint,
             method,
-            json.dumps(parameters) if parameters else None,
+            _dumps(parameters) if parameters else None,
             response_status,
-            json.dumps(response_data) if response_data else None,
+            _dumps(response_data) if response_data else None,
             execution_time
-        ))
+        )
+        with self._log_lock:
+            self._log_buffer.append(row)
+            full = len(self._log_buffer) >= self._log_batch_size
+        if full:
+            self._log_wakeup.set()
+    
+    def _log_flush_loop(self):
+        """Flush buffered request logs every interval, or sooner when a batch fills.
+        
+        Old request logs are pruned from the same thread every prune interval.
+        """
+        last_prune = time.monotonic()
+        while True:
+            self._log_wakeup.wait(self._log_flush_interval)
+            self._log_wakeup.clear()
+            try:
+                self._flush_logs()
+                if time.monotonic() - last_prune >= self._log_prune_interval:
+                    last_prune = time.monotonic()
+                    self.prune_logs(self._log_retention_days)
+            except Exception:
+                # Already logged by @log_exception; keep the flusher alive
+                pass
+    
+    @log_exception()
+    def _flush_logs(self):
+        """Write all buffered request logs in a single transaction"""
+        with self._log_lock:
+            if not self._log_buffer:
+                return
+            rows, self._log_buffer = self._log_buffer, deque()
         
-        conn.commit()
-        conn.close()
+        try:
+            try:
+                with self._get_conn(write=True) as conn:
+                    conn.executemany(_INSERT_REQUEST_LOG_SQL, rows)
+            except _BAD_ROW_ERRORS:
+                # One bad row fails the whole batch; write the rest one by one
+                self._insert_logs_individually(rows)
+        except sqlite3.OperationalError:
+            # Locked or busy: keep the batch for the next flush
+            self._requeue_logs(rows)
+            raise
+    
+    def _insert_logs_individually(self, rows: deque):
+        """Insert rows one at a time, dropping and logging those that cannot be written"""
+        dropped = 0
+        with self._get_conn(write=True) as conn:
+            for row in rows:
+                try:
+                    conn.execute(_INSERT_REQUEST_LOG_SQL, row)
+                except _BAD_ROW_ERRORS as e:
+                    dropped += 1
+                    logger.error("Dropping request log for endpoint %r: %s", row[0], e)
+        if dropped:
+            logger.warning("Dropped %d of %d buffered request logs that could not be written", dropped, len(rows))
+    
+    def _requeue_logs(self, rows: deque):
+        """Put unwritten rows back ahead of newer ones, dropping the oldest past the buffer limit"""
+        with self._log_lock:
+            rows.extend(self._log_buffer)
+            dropped = max(0, len(rows) - self._log_buffer_limit)
+            for _ in range(dropped):
+                rows.popleft()
+            self._log_buffer = rows
+        if dropped:
+            logger.warning("Dropped %d buffered request logs after a failed flush", dropped)
+    
+    @log_exception()
+    @log_execution_time()
+    def prune_logs(self, days: int = 7) -> int:
+        """Delete request logs older than ``days`` and refresh their statistics"""
+        with self._get_conn(write=True) as conn:
+            deleted = conn.execute(
+                "DELETE FROM request_logs WHERE created_at < datetime('now', ?)",
+                (f'-{int(days)} days',)
+            ).rowcount
+            conn.execute('ANALYZE request_logs')
+        return deleted
     
     @log_exception()
     @log_execution_time()
     def store_market_trends(self, commodity: str, state: str, market: str, trends_data: Dict):
         """Store market trends data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.upsert_and_get_trends(commodity, state, market, trends_data)
+    
+    @log_exception()
+    @log_execution_time()
+    def upsert_and_get_trends(self, commodity: str, state: str, market: str,
+                              fresh_trends: Optional[Dict] = None) -> Tuple[Optional[Dict], Optional[float]]:
+        """Fetch or atomically replace the market trends entry in a single statement.
         
-        cursor.execute('''
-            INSERT INTO market_trends (
-                commodity, state, market, latest_price, trend, percentage_change,
-                data_points_found, average_price, highest_price, lowest_price,
-                prices_data, message
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            commodity, state, market,
-            trends_data.get('latest_price'),
-            trends_data.get('trend'),
-            trends_data.get('percentage_change'),
-            trends_data.get('data_points_found'),
-            trends_data.get('average_price'),
-            trends_data.get('highest_price'),
-            trends_data.get('lowest_price'),
-            json.dumps(trends_data.get('prices', [])),
-            trends_data.get('message')
-        ))
+        With ``fresh_trends=None`` only the current entry is read; otherwise it is
+        upserted with ``RETURNING``. Returns ``(data, age_seconds)``, or
+        ``(None, None)`` when nothing is stored for the key.
+        """
+        key = (commodity, state, market)
+        if fresh_trends is None:
+            with self._cache_lock:
+                cached = self._trends_cache.get(key)
+            if cached:
+                data, age, fetched_at = cached
+                return data, age + (time.monotonic() - fetched_at)
+            
+            with self._get_conn() as conn:
+                row = conn.execute(f'''
+                    SELECT {_TRENDS_COLUMNS}, {_AGE_SECONDS_SQL} FROM market_trends
+                    WHERE commodity = ? AND state = ? AND market = ?
+                ''', key).fetchone()
+        else:
+            prices_json = _dumps(fresh_trends.get('prices', []))
+            with self._get_conn(write=True) as conn:
+                row = conn.execute(f'''
+                    INSERT INTO market_trends (
+                        commodity, state, market, latest_price, trend, percentage_change,
+                        data_points_found, average_price, highest_price, lowest_price,
+                        prices_data, message
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(commodity, state, market) DO UPDATE SET
+                        latest_price = excluded.latest_price,
+                        trend = excluded.trend,
+                        percentage_change = excluded.percentage_change,
+                        data_points_found = excluded.data_points_found,
+                        average_price = excluded.average_price,
+                        highest_price = excluded.highest_price,
+                        lowest_price = excluded.lowest_price,
+                        prices_data = excluded.prices_data,
+                        message = excluded.message,
+                        created_at = CURRENT_TIMESTAMP
+                    RETURNING {_TRENDS_COLUMNS}, {_AGE_SECONDS_SQL}
+                ''', (
+                    commodity, state, market,
+                    fresh_trends.get('latest_price'),
+                    fresh_trends.get('trend'),
+                    fresh_trends.get('percentage_change'),
+                    fresh_trends.get('data_points_found'),
+                    fresh_trends.get('average_price'),
+                    fresh_trends.get('highest_price'),
+                    fresh_trends.get('lowest_price'),
+                    prices_json,
+                    fresh_trends.get('message')
+                )).fetchone()
         
-        conn.commit()
-        conn.close()
+        if row:
+            data, age = self._trends_from_row(row), row['age_seconds']
+            with self._cache_lock:
+                self._trends_cache[key] = (data, age, time.monotonic())
+            return data, age
+        return None, None
+    
+    @staticmethod
+    def _trends_from_row(row: sqlite3.Row) -> Dict:
+        """Build the market trends dict from a market_trends row"""
+        trends = {key: row[key] for key in row.keys() if key not in ('prices_data', 'age_seconds')}
+        trends['prices'] = orjson.loads(row['prices_data']) if row['prices_data'] else []
+        return trends
     
     @log_exception()
     @log_execution_time()
     def get_market_trends(self, commodity: str, state: str, market: str) -> Optional[Dict]:
         """Get stored market trends data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM market_trends 
-            WHERE commodity = ? AND state = ? AND market = ?
-            ORDER BY created_at DESC LIMIT 1
-        ''', (commodity, state, market))
-        
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return {
-                'commodity': row[1],
-                'state': row[2],
-                'market': row[3],
-                'latest_price': row[4],
-                'trend': row[5],
-                'percentage_change': row[6],
-                'data_points_found': row[7],
-                'average_price': row[8],
-                'highest_price': row[9],
-                'lowest_price': row[10],
-                'prices': json.loads(row[11]) if row[11] else [],
-                'message': row[12]
-            }
-        return None
+        data, _ = self.upsert_and_get_trends(commodity, state, market)
+        return data
     
     @log_exception()
     @log_execution_time()
     def store_govt_schemes(self, query: str, schemes_data: List[Dict], message: str = None):
         """Store government schemes data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO govt_schemes (query, schemes_data, message)
-            VALUES (?, ?, ?)
-        ''', (query, json.dumps(schemes_data), message))
-        
-        conn.commit()
-        conn.close()
+        schemes_json = _dumps(schemes_data)
+        with self._get_conn(write=True) as conn:
+            conn.execute('''
+                INSERT INTO govt_schemes (query, schemes_data, message)
+                VALUES (?, ?, ?)
+            ''', (query, schemes_json, message))
+        with self._cache_lock:
+            self._schemes_cache.pop(query, None)
     
     @log_exception()
     @log_execution_time()
     def get_govt_schemes(self, query: str) -> Optional[Dict]:
         """Get stored government schemes data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM govt_schemes 
-            WHERE query = ?
-            ORDER BY created_at DESC LIMIT 1
-        ''', (query,))
+        with self._cache_lock:
+            cached = self._schemes_cache.get(query)
+        if cached:
+            return cached
         
-        row = cursor.fetchone()
-        conn.close()
+        with self._get_conn() as conn:
+            row = conn.execute('''
+                SELECT schemes_data, message FROM govt_schemes 
+                WHERE query = ?
+                ORDER BY created_at DESC, id DESC LIMIT 1
+            ''', (query,)).fetchone()
         
         if row:
-            return {
-                'schemes': json.loads(row[2]),
-                'message': row[3]
+            schemes = {
+                'schemes': orjson.loads(row['schemes_data']),
+                'message': row['message']
             }
+            with self._cache_lock:
+                self._schemes_cache[query] = schemes
+            return schemes
         return None
     
     @log_exception()
     @log_execution_time()
     def store_weather_data(self, latitude: float, longitude: float, weather_info: Dict):
         """Store weather data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO weather_data (latitude, longitude, weather_info)
-            VALUES (?, ?, ?)
-        ''', (latitude, longitude, json.dumps(weather_info)))
-        
-        conn.commit()
-        conn.close()
+        weather_json = _dumps(weather_info)
+        with self._get_conn(write=True) as conn:
+            conn.execute('''
+                INSERT INTO weather_data (latitude, longitude, weather_info)
+                VALUES (?, ?, ?)
+            ''', (latitude, longitude, weather_json))
 
     
     @log_exception()
     @log_execution_time()
     def store_soil_analysis(self, latitude: float, longitude: float, soil_data: Dict):
         """Store soil analysis data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO soil_analysis (latitude, longitude, soil_data)
-            VALUES (?, ?, ?)
-        ''', (latitude, longitude, json.dumps(soil_data)))
-        
-        conn.commit()
-        conn.close()
+        soil_json = _dumps(soil_data)
+        with self._get_conn(write=True) as conn:
+            conn.execute('''
+                INSERT INTO soil_analysis (latitude, longitude, soil_data)
+                VALUES (?, ?, ?)
+            ''', (latitude, longitude, soil_json))
     
     @log_exception()
     @log_execution_time()
     def store_crop_analysis(self, filename: str, query: str, analysis_result: Dict):
         """Store crop analysis result"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO crop_analysis (filename, query, analysis_result)
-            VALUES (?, ?, ?)
-        ''', (filename, query, json.dumps(analysis_result)))
-        
-        conn.commit()
-        conn.close()
+        analysis_json = _dumps(analysis_result)
+        with self._get_conn(write=True) as conn:
+            conn.execute('''
+                INSERT INTO crop_analysis (filename, query, analysis_result)
+                VALUES (?, ?, ?)
+            ''', (filename, query, analysis_json))
     
     @log_exception()
     @log_execution_time()
     def get_request_stats(self) -> Dict:
         """Get request statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT endpoint, COUNT(*) FROM request_logs GROUP BY endpoint')
-        endpoint_stats = dict(cursor.fetchall())
-        
-        cursor.execute('SELECT COUNT(*) FROM request_logs WHERE DATE(created_at) = DATE("now")')
-        today_requests = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT AVG(execution_time) FROM request_logs')
-        avg_response_time = cursor.fetchone()[0] or 0
+        try:
+            self._flush_logs()
+        except sqlite3.Error:
+            # Already logged by @log_exception; report what has been written so far
+            pass
+        with self._get_conn() as conn:
+            # One pass over request_logs; per-endpoint partials are combined below
+            rows = conn.execute('''
+                SELECT endpoint,
+                       COUNT(*),
+                       SUM(CASE WHEN DATE(created_at) = DATE('now') THEN 1 ELSE 0 END),
+                       SUM(execution_time),
+                       COUNT(execution_time)
+                FROM request_logs
+                GROUP BY endpoint
+            ''').fetchall()
         
-        conn.close()
+        endpoint_stats = {endpoint: count for endpoint, count, _, _, _ in rows}
+        today_requests = sum(today for _, _, today, _, _ in rows)
+        total_time = sum(time_sum or 0 for _, _, _, time_sum, _ in rows)
+        timed_requests = sum(timed for _, _, _, _, timed in rows)
+        avg_response_time = total_time / timed_requests if timed_requests else 0
         
         return {
             'endpoint_stats': endpoint_stats,
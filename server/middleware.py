@@ -4,12 +4,40 @@ Middleware and error handlers for Flask application.
 Implements request/response middleware, error handling, and logging.
 """
 
+import itertools
+import logging
+import os
+import threading
 import time
-import traceback
+from collections import OrderedDict, deque
 from functools import wraps
 from flask import request, jsonify, g
 from typing import Callable, Any
-import uuid
+from utils.logging import get_logger
+
+_mw_logger = get_logger('middleware')
+_eh_logger = get_logger('error_handler')
+
+# Environment is read once at import; restart the app to pick up changes
+_EXPECTED_API_KEY = os.getenv('API_KEY')
+_IS_DEV = os.getenv('FLASK_ENV') == 'development'
+# Set LOG_TRACEBACKS=0 to skip traceback formatting in error logs
+_LOG_TRACEBACKS = os.getenv('LOG_TRACEBACKS', '1') != '0'
+
+# Security headers added to every response
+_SEC_HEADERS = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+)
+
+# Request IDs are pid-prefixed counters: unique across workers without reading urandom
+_request_counter = itertools.count(1)
+
+
+def _next_request_id() -> str:
+    """Generate a cheap, process-unique request ID."""
+    return f'{os.getpid():x}-{next(_request_counter):x}'
 
 
 class RequestMiddleware:
@@ -30,37 +58,32 @@ class RequestMiddleware:
     def before_request():
         """Execute before each request."""
         # Generate unique request ID
-        g.request_id = str(uuid.uuid4())
+        g.request_id = _next_request_id()
         g.start_time = time.time()
         
         # Log request
-        from utils.logging import get_logger
-        logger = get_logger('middleware')
-        logger.info(
-            f"Request started: {request.method} {request.path}",
-            extra={'request_id': g.request_id}
-        )
+        if _mw_logger.isEnabledFor(logging.INFO):
+            _mw_logger.info(
+                "Request started: %s %s", request.method, request.path,
+                extra={'request_id': g.request_id}
+            )
     
     @staticmethod
     def after_request(response):
         """Execute after each request."""
+        # Add security headers in one call
+        response.headers.extend(_SEC_HEADERS)
+        
         # Add request ID to response headers
         if hasattr(g, 'request_id'):
             response.headers['X-Request-ID'] = g.request_id
         
-        # Add CORS headers
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        
         # Log response
-        if hasattr(g, 'start_time'):
+        if hasattr(g, 'start_time') and _mw_logger.isEnabledFor(logging.INFO):
             elapsed = time.time() - g.start_time
-            from utils.logging import get_logger
-            logger = get_logger('middleware')
-            logger.info(
-                f"Request completed: {request.method} {request.path} "
-                f"- Status: {response.status_code} - Time: {elapsed:.3f}s",
+            _mw_logger.info(
+                "Request completed: %s %s - Status: %s - Time: %.3fs",
+                request.method, request.path, response.status_code, elapsed,
                 extra={'request_id': getattr(g, 'request_id', 'unknown')}
             )
         
@@ -69,12 +92,10 @@ class RequestMiddleware:
     @staticmethod
     def teardown_request(exception=None):
         """Execute at the end of request, even if exception occurred."""
-        if exception:
-            from utils.logging import get_logger
-            logger = get_logger('middleware')
-            logger.error(
-                f"Request failed with exception: {str(exception)}",
-                exc_info=True,
+        if exception is not None and _mw_logger.isEnabledFor(logging.ERROR):
+            _mw_logger.error(
+                "Request failed with exception: %s", exception,
+                exc_info=exception if _LOG_TRACEBACKS else None,
                 extra={'request_id': getattr(g, 'request_id', 'unknown')}
             )
 
@@ -156,13 +177,12 @@ class ErrorHandler:
     
     def handle_internal_error(self, error):
         """Handle 500 Internal Server errors."""
-        from utils.logging import get_logger
-        logger = get_logger('error_handler')
-        logger.error(
-            f"Internal server error: {str(error)}",
-            exc_info=True,
-            extra={'request_id': getattr(g, 'request_id', 'unknown')}
-        )
+        if _eh_logger.isEnabledFor(logging.ERROR):
+            _eh_logger.error(
+                "Internal server error: %s", error,
+                exc_info=_LOG_TRACEBACKS,
+                extra={'request_id': getattr(g, 'request_id', 'unknown')}
+            )
         
         return self._create_error_response(
             500,
@@ -180,17 +200,15 @@ class ErrorHandler:
     
     def handle_generic_exception(self, error):
         """Handle any unhandled exceptions."""
-        from utils.logging import get_logger
-        logger = get_logger('error_handler')
-        logger.error(
-            f"Unhandled exception: {str(error)}",
-            exc_info=True,
-            extra={'request_id': getattr(g, 'request_id', 'unknown')}
-        )
+        if _eh_logger.isEnabledFor(logging.ERROR):
+            _eh_logger.error(
+                "Unhandled exception: %s", error,
+                exc_info=_LOG_TRACEBACKS,
+                extra={'request_id': getattr(g, 'request_id', 'unknown')}
+            )
         
         # Return generic error in production, detailed in development
-        import os
-        if os.getenv('FLASK_ENV') == 'development':
+        if _IS_DEV:
             return self._create_error_response(
                 500,
                 'Internal Server Error',
@@ -208,13 +226,13 @@ def require_api_key(func: Callable) -> Callable:
     """Decorator to require API key authentication."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        api_key = request.headers.get('X-API-Key')
+        # No key configured: authentication is disabled
+        if not _EXPECTED_API_KEY:
+            return func(*args, **kwargs)
         
         # In production, validate against stored API keys
-        import os
-        expected_key = os.getenv('API_KEY')
-        
-        if expected_key and api_key != expected_key:
+        api_key = request.headers.get('X-API-Key')
+        if api_key != _EXPECTED_API_KEY:
             return jsonify({
                 'error': 'Invalid or missing API key',
                 'status_code': 401
@@ -224,60 +242,69 @@ def require_api_key(func: Callable) -> Callable:
     return wrapper
 
 
-def rate_limit(max_requests: int = 100, window_seconds: int = 60):
+def rate_limit(max_requests: int = 100, window_seconds: int = 60, max_clients: int = 10000):
     """Decorator to implement rate limiting."""
     def decorator(func: Callable) -> Callable:
+        # Simple in-memory sliding window per client, least recently seen
+        # clients evicted past max_clients. In production, use Redis or similar
+        clients: "OrderedDict[str, deque]" = OrderedDict()
+        lock = threading.Lock()
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Simple in-memory rate limiting
-            # In production, use Redis or similar
-            from collections import defaultdict
-            import time
-            
-            if not hasattr(wrapper, '_rate_limit_data'):
-                wrapper._rate_limit_data = defaultdict(list)
-            
             client_ip = request.remote_addr
-            current_time = time.time()
+            current_time = time.monotonic()
             
-            # Clean old requests
-            wrapper._rate_limit_data[client_ip] = [
-                req_time for req_time in wrapper._rate_limit_data[client_ip]
-                if current_time - req_time < window_seconds
-            ]
+            with lock:
+                timestamps = clients.get(client_ip)
+                if timestamps is None:
+                    timestamps = clients[client_ip] = deque()
+                    if len(clients) > max_clients:
+                        clients.popitem(last=False)
+                else:
+                    clients.move_to_end(client_ip)
+                
+                # Drop requests that fell out of the window
+                while timestamps and current_time - timestamps[0] >= window_seconds:
+                    timestamps.popleft()
+                
+                # Check rate limit
+                limited = len(timestamps) >= max_requests
+                if not limited:
+                    timestamps.append(current_time)
             
-            # Check rate limit
-            if len(wrapper._rate_limit_data[client_ip]) >= max_requests:
+            if limited:
                 return jsonify({
                     'error': 'Rate limit exceeded',
                     'status_code': 429,
                     'retry_after': window_seconds
                 }), 429
             
-            # Add current request
-            wrapper._rate_limit_data[client_ip].append(current_time)
-            
             return func(*args, **kwargs)
+        
+        wrapper._rate_limit_data = clients
         return wrapper
     return decorator
 
 
 def validate_request_data(*required_fields):
     """Decorator to validate required fields in request data."""
+    required = frozenset(required_fields)
+    
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            if request.is_json:
-                data = request.get_json()
-            else:
-                data = request.form.to_dict()
+            # Malformed or non-object JSON falls through to form data
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                data = request.form
             
-            missing_fields = [field for field in required_fields if field not in data]
+            missing_fields = required.difference(data)
             
             if missing_fields:
                 return jsonify({
                     'error': 'Missing required fields',
-                    'missing_fields': missing_fields,
+                    'missing_fields': sorted(missing_fields),
                     'status_code': 400
                 }), 400
             
@@ -1,5 +1,6 @@
+import orjson
 import requests
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
 from typing import List, Dict
 from utils.logging import get_logger
@@ -16,6 +17,16 @@ logger = get_logger(__name__)
 
 rag_system = GovernmentRAGSystem()
 
+
+# Fields every document source must provide
+_SOURCE_FIELDS = ('url', 'title', 'organization')
+
+
+def _ojson(obj, status=200):
+    """Build a JSON response encoded with orjson"""
+    body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=str)
+    return Response(body, status=status, mimetype='application/json')
+
 # Simulated source list and mock scheme data
 @app.route('/api/rag/search', methods=['POST'])
 def search_schemes():
@@ -25,34 +36,34 @@ def search_schemes():
         user_profile = data.get('user_profile', None)
 
         if not query:
-            return jsonify({'error': 'Query parameter is required'}), 400
+            return _ojson({'error': 'Query parameter is required'}, 400)
 
         results = rag_system.search_schemes(query, user_profile)
-        return jsonify({'results': results}), 200
+        return _ojson({'results': results}, 200)
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _ojson({'error': str(e)}, 500)
 
 @app.route('/api/rag/scheme/<scheme_id>', methods=['GET'])
 def get_scheme_details(scheme_id):
     try:
         details = rag_system.get_scheme_details(scheme_id)
         if not details:
-            return jsonify({'error': 'Scheme not found'}), 404
+            return _ojson({'error': 'Scheme not found'}, 404)
         
-        return jsonify(details), 200
+        return _ojson(details, 200)
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _ojson({'error': str(e)}, 500)
 
 @app.route('/api/rag/scrape', methods=['POST'])
 def scrape_government_websites():
     try:
         scraped_data = rag_system.scrape_government_websites()
-        return jsonify({'scraped_data': scraped_data}), 200
+        return _ojson({'scraped_data': scraped_data}, 200)
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _ojson({'error': str(e)}, 500)
 
 @app.route('/api/rag/add-document', methods=['POST'])
 def add_document():
@@ -64,7 +75,7 @@ def add_document():
         keywords = data.get('keywords', [])
 
         if not all([content, source_info, scheme_id]):
-            return jsonify({'error': 'Missing required fields'}), 400
+            return _ojson({'error': 'Missing required fields'}, 400)
 
         source = DocumentSource(
             url=source_info['url'],
@@ -74,10 +85,52 @@ def add_document():
 
         rag_system.add_document(content, source, scheme_id, keywords)
 
-        return jsonify({'message': 'Document added successfully'}), 201
+        return _ojson({'message': 'Document added successfully'}, 201)
+
+    except Exception as e:
+        return _ojson({'error': str(e)}, 500)
+
+@app.route('/api/rag/add-documents', methods=['POST'])
+def add_documents():
+    try:
+        data = request.get_json(silent=True) or {}
+        documents = data.get('documents')
+
+        if not isinstance(documents, list) or not documents:
+            return _ojson({'error': 'documents must be a non-empty list'}, 400)
+
+        batch = []
+        for index, doc in enumerate(documents):
+            if not isinstance(doc, dict):
+                return _ojson({'error': f'Document {index} must be an object'}, 400)
+
+            content = doc.get('content')
+            source_info = doc.get('source')
+            scheme_id = doc.get('scheme_id')
+
+            if not all([content, source_info, scheme_id]):
+                return _ojson({'error': f'Missing required fields in document {index}'}, 400)
+
+            if not isinstance(source_info, dict) or not all(
+                source_info.get(field) for field in _SOURCE_FIELDS
+            ):
+                return _ojson({
+                    'error': f'source in document {index} must include {", ".join(_SOURCE_FIELDS)}'
+                }, 400)
+
+            source = DocumentSource(
+                url=source_info['url'],
+                title=source_info['title'],
+                organization=source_info['organization']
+            )
+            batch.append((content, source, scheme_id, doc.get('keywords', [])))
+
+        added = rag_system.add_documents_bulk(batch)
+
+        return _ojson({'message': 'Documents added successfully', 'count': added}, 201)
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _ojson({'error': str(e)}, 500)
 
 if __name__ == '__main__':
     app.run(debug = True, host='0.0.0.0', port=5000)
@@ -4,6 +4,7 @@ Service layer for Kisan-G application.
 Implements business logic with dependency injection and service patterns.
 """
 
+from functools import wraps
 from typing import Optional, Dict, Any
 from abc import ABC, abstractmethod
 
@@ -13,6 +14,8 @@ class ServiceRegistry:
     
     _instance: Optional['ServiceRegistry'] = None
     _services: Dict[str, Any] = {}
+    # Bumped on every change so bound injections know to re-resolve
+    _generation: int = 0
     
     def __new__(cls):
         if cls._instance is None:
@@ -22,14 +25,23 @@ class ServiceRegistry:
     def register(self, service_name: str, service_instance: Any):
         """Register a service instance."""
         self._services[service_name] = service_instance
+        ServiceRegistry._generation += 1
     
     def get(self, service_name: str) -> Any:
         """Retrieve a service instance."""
         return self._services.get(service_name)
     
+    def bind(self, service_name: str) -> Any:
+        """Resolve a registered service once, raising if it is missing."""
+        service = self._services.get(service_name)
+        if service is None:
+            raise RuntimeError(f"Service '{service_name}' not registered")
+        return service
+    
     def clear(self):
         """Clear all registered services (useful for testing)."""
         self._services.clear()
+        ServiceRegistry._generation += 1
 
 
 # Global service registry instance
@@ -39,10 +51,15 @@ service_registry = ServiceRegistry()
 def inject_service(service_name: str):
     """Decorator for dependency injection of services."""
     def decorator(func):
+        # Resolved on first call and reused until the registry changes
+        bound = [None, -1]
+
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            service = service_registry.get(service_name)
-            if service is None:
-                raise RuntimeError(f"Service '{service_name}' not registered")
-            return func(*args, service=service, **kwargs)
+            if bound[1] != ServiceRegistry._generation:
+                bound[0] = service_registry.bind(service_name)
+                bound[1] = ServiceRegistry._generation
+                wrapper.__wrapped_service__ = bound[0]
+            return func(*args, service=bound[0], **kwargs)
         return wrapper
     return decorator
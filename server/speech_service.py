@@ -1,9 +1,12 @@
 from utils.logging import get_logger
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+import orjson
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
+from google.cloud import speech
 from pydub import AudioSegment
 
 load_dotenv()
@@ -17,27 +20,63 @@ logger = get_logger(__name__)
 
 os.makedirs('uploads', exist_ok=True)
 
+
+@lru_cache(maxsize=1)
+def _get_client() -> speech.SpeechClient:
+    """Shared gRPC client, created on first use so channel setup happens once"""
+    return speech.SpeechClient()
+
+
+# RecognitionConfig per file extension, built on first use
+_CONFIG_CACHE: dict = {}
+
+_SUPPORTED_FORMATS = frozenset({'wav', 'mp3', 'ogg', 'webm'})
+
+_ENCODING_MAP = {
+    'wav': speech.RecognitionConfig.AudioEncoding.LINEAR16,
+    'mp3': speech.RecognitionConfig.AudioEncoding.MP3,
+    'ogg': speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
+    'webm': speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,  # Browser MediaRecorder output
+    'flac': speech.RecognitionConfig.AudioEncoding.FLAC
+}
+
+# sample_rate_hertz per format. Opus always decodes at 48 kHz; MP3 and FLAC
+# are left unset so Google uses the rate from the file header.
+_SAMPLE_RATES = {
+    'wav': 16000,
+    'ogg': 48000,
+    'webm': 48000,
+}
+
+_SUPPORTED_LANGUAGES = (
+    "en-US", "en-IN", "hi-IN", "bn-IN", "te-IN",
+    "ta-IN", "mr-IN", "gu-IN", "kn-IN", "pa-IN"
+)
+
+# Pre-encoded body for /api/speech/languages
+_LANGUAGES_RESPONSE = orjson.dumps({'languages': _SUPPORTED_LANGUAGES})
+
+
 class ChirpSTTService:
     
     def __init__(self, file_ext) -> None:
-        self.supported_formats = ['wav', 'mp3', 'ogg', 'webm']
+        self.supported_formats = _SUPPORTED_FORMATS
         self.file_ext = file_ext
         
     def transcribe_audio(self, audio_file_path: str) -> dict:
         try:
-            client = speech.SpeechClient()
-            
             with open(audio_file_path, 'rb') as f:
                 content = f.read()
-                
+        except OSError as e:
+            logger.error(f"Error reading audio file: {str(e)}")
+            return {"error": f"Transcription failed: {str(e)}"}
+        return self.transcribe_content(content)
+    
+    def transcribe_content(self, content: bytes) -> dict:
+        try:
+            client = _get_client()
             audio = speech.RecognitionAudio(content=content)
-            
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
-                language_code = "en-US",
-                model = "chirp"
-            )
+            config = self._get_config()
             response = client.recognize(config=config, audio=audio)
             if not response.results:
                 return {"error": "no transcription resuls."}
@@ -55,17 +94,25 @@ class ChirpSTTService:
             logger.error(f"Error transcribing audio: {str(e)}")
             return {"error": f"Transcription failed: {str(e)}"}
     
+    def _get_config(self) -> speech.RecognitionConfig:
+        config = _CONFIG_CACHE.get(self.file_ext)
+        if config is None:
+            config = speech.RecognitionConfig(
+                encoding=self.get_audio_encoding(self.file_ext),
+                language_code = "en-US",
+                model = "chirp"
+            )
+            sample_rate = _SAMPLE_RATES.get(self.file_ext)
+            if sample_rate is not None:
+                config.sample_rate_hertz = sample_rate
+            _CONFIG_CACHE[self.file_ext] = config
+        return config
+    
     def get_audio_encoding(self, file_ext: str):
-        mapping = {
-            'wav': speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            'mp3': speech.RecognitionConfig.AudioEncoding.MP3,
-            'ogg': speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
-            'webm': speech.RecognitionConfig.AudioEncoding.OGG_OPUS,  # WebM often uses OGG_OPUS codec
-            'flac': speech.RecognitionConfig.AudioEncoding.FLAC
-        }
-        if file_ext not in mapping:
-            raise ValueError(f"Unsupported audio format: {file_ext}")
-        return mapping[file_ext]
+        try:
+            return _ENCODING_MAP[file_ext]
+        except KeyError:
+            raise ValueError(f"Unsupported audio format: {file_ext}") from None
         
     
     def process_audio_data(self, audio_data: bytes, format: str = 'wav') -> dict:
@@ -73,20 +120,8 @@ class ChirpSTTService:
             if format not in self.supported_formats:
                 return {"error": f"Unsupported audio format: {format}"}
             
-            temp_filename = f"temp_audio.{format}"
-            temp_path = os.path.join('uploads', temp_filename)
-            
-            with open(temp_path, 'wb') as f:
-                f.write(audio_data)
-            
-            # Transcribe
-            result = self.transcribe_audio(temp_path)
-            
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            
-            return result
+            # Audio is already in memory; send it straight to the recognizer
+            return self.transcribe_content(audio_data)
             
         except Exception as e:
             logger.error(f"Error processing audio data: {str(e)}")
@@ -97,10 +132,7 @@ class ChirpSTTService:
         Get list of supported languages for STT
         Returns:List of supported language codes
         """
-        return [
-            "en-US", "en-IN", "hi-IN", "bn-IN", "te-IN", 
-            "ta-IN", "mr-IN", "gu-IN", "kn-IN", "pa-IN"
-        ]
+        return list(_SUPPORTED_LANGUAGES)
 
 # Initialize STT service function
 def get_stt_service(file_ext):
@@ -139,9 +171,7 @@ def transcribe_speech():
 @app.route('/api/speech/languages', methods=['GET'])
 def get_supported_languages():
     """Get supported languages for STT"""
-    stt_service = get_stt_service('wav')  # Use default format for languages
-    languages = stt_service.get_supported_languages()
-    return jsonify({'languages': languages}), 200
+    return Response(_LANGUAGES_RESPONSE, status=200, mimetype='application/json')
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
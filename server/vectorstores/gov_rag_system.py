@@ -259,6 +259,42 @@ class GovernmentRAGSystem:
         except Exception as e:
             logger.error(f"Error adding document: {str(e)}")
     
+    def add_documents_bulk(self, documents: List[Tuple[str, DocumentSource, str, List[str]]]) -> int:
+        """
+        Add many documents to the RAG system in one batch
+        
+        Args:
+            documents: (content, source, scheme_id, keywords) tuples; batches
+                of 1k-10k documents keep per-call overhead low
+            
+        Returns:
+            Number of documents added
+            
+        Raises:
+            Any error from building the batch; nothing is added in that case
+        """
+        sources = {}
+        docs = []
+        for content, source, scheme_id, keywords in documents:
+            sources.setdefault(source.id, source)
+            docs.append({
+                "content": content,
+                "source_id": source.id,
+                "scheme_id": scheme_id,
+                "keywords": keywords
+            })
+        # In real implementation, generate proper embeddings in one batch
+        embeddings = np.random.rand(len(docs), 128).tolist()
+        
+        # Only touch shared state once the whole batch is built
+        for source_id, source in sources.items():
+            self.sources.setdefault(source_id, source)
+        self.documents.extend(docs)
+        self.embeddings.extend(embeddings)
+        
+        logger.info("Added %d documents in bulk", len(docs))
+        return len(docs)
+    
     def scrape_government_websites(self) -> List[Dict]:
         """
         Scrape government websites for latest scheme information
@@ -9,19 +9,67 @@ Provides voice assistant capabilities including:
 """
 
 import assemblyai as aai
+import asyncio
+import httpx
 import os
 import re
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 from enum import Enum
 from dotenv import load_dotenv
 from utils.logging import get_logger
 
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 load_dotenv()
 
 logger = get_logger(__name__)
 
 
+def _check_lowercase(intent_patterns):
+    """Patterns are matched against lowercased text, so they must be lowercase."""
+    for intent, patterns in intent_patterns.items():
+        for p in patterns:
+            literal = re.sub(r"\\.", "", p)  # escapes like \S are not letters
+            if literal != literal.lower():
+                raise ValueError(f"{intent.name} pattern must be lowercase: {p!r}")
+
+
+def _build_master(intent_patterns):
+    """Compile every intent into one regex with a named group per intent.
+    
+    Each alternative is an anchored lookahead, so intents are tried in dict
+    order rather than matching whichever phrase appears first in the text.
+    Patterns are case-sensitive; callers match against lowercased text.
+    """
+    _check_lowercase(intent_patterns)
+    return re.compile(
+        "^(?:" + "|".join(
+            rf"(?=[\s\S]*?(?P<{intent.name}>" + "|".join(f"(?:{p})" for p in patterns) + "))"
+            for intent, patterns in intent_patterns.items()
+        ) + ")"
+    )
+
+
+def _build_re2_set(pattern_groups):
+    """Compile one RE2 alternation per group into a linear-time search set"""
+    if re2 is None:
+        return None
+    pattern_set = re2.Set.SearchSet(re2.Options())
+    for patterns in pattern_groups:
+        pattern_set.Add("|".join(f"(?:{p})" for p in patterns))
+    pattern_set.Compile()
+    return pattern_set
+
+
 class NavigationIntent(Enum):
     """Available navigation intents for voice commands."""
     DASHBOARD = "dashboard"
@@ -57,43 +105,92 @@ class VoiceNavigationAgent:
     # Intent patterns for matching voice commands
     INTENT_PATTERNS = {
         NavigationIntent.DASHBOARD: [
-            r"\b(go to|open|show|navigate to)\s+dashboard\b",
-            r"\b(go to|show me)\s+home\b",
+            r"\b(?:go to|open|show|navigate to)\s+dashboard\b",
+            r"\b(?:go to|show me)\s+home\b",
             r"\bmain\s+screen\b",
         ],
         NavigationIntent.CROP_DOCTOR: [
-            r"\b(check|analyze|diagnose)\s+(my\s+)?(crop|plant)s?\b",
-            r"\b(crop|plant)\s+(doctor|disease|health)\b",
+            r"\b(?:check|analyze|diagnose)\s+(?:my\s+)?(?:crops?|plants?)\b",
+            r"\b(?:crop|plant)\s+(?:doctor|disease|health)\b",
             r"\bopen\s+crop\s+doctor\b",
         ],
         NavigationIntent.MARKET_ANALYST: [
-            r"\b(check|show|get)\s+(market|price)s?\b",
-            r"\b(market|price)\s+(trend|analysis|data)\b",
+            r"\b(?:check|show|get)\s+(?:markets?|prices?)\b",
+            r"\b(?:market|price)\s+(?:trend|analysis|data)\b",
             r"\bopen\s+market\s+analyst\b",
         ],
         NavigationIntent.SCHEME_NAVIGATOR: [
-            r"\b(find|show|search)\s+(government\s+)?schemes?\b",
+            r"\b(?:find|show|search)\s+(?:government\s+)?schemes?\b",
             r"\bscheme\s+navigator\b",
             r"\bgovernment\s+programs?\b",
         ],
         NavigationIntent.SOIL_ANALYSIS: [
-            r"\b(check|analyze|test)\s+soil\b",
-            r"\bsoil\s+(analysis|health|condition)\b",
+            r"\b(?:check|analyze|test)\s+soil\b",
+            r"\bsoil\s+(?:analysis|health|condition)\b",
         ],
         NavigationIntent.WEATHER: [
-            r"\b(check|show|what's)\s+the\s+weather\b",
-            r"\bweather\s+(forecast|information)\b",
+            r"\b(?:check|show|what's)\s+the\s+weather\b",
+            r"\bweather\s+(?:forecast|information)\b",
         ],
         NavigationIntent.PROFILE: [
-            r"\b(go to|open|show)\s+(my\s+)?profile\b",
+            r"\b(?:go to|open|show)\s+(?:my\s+)?profile\b",
             r"\baccount\s+settings\b",
         ],
         NavigationIntent.LANGUAGE_SELECT: [
-            r"\b(change|select)\s+language\b",
-            r"\blanguage\s+(settings|selection)\b",
+            r"\b(?:change|select)\s+language\b",
+            r"\blanguage\s+(?:settings|selection)\b",
         ],
     }
     
+    # All intents in one regex, tried in INTENT_PATTERNS priority order
+    _MASTER = _build_master(INTENT_PATTERNS)
+    
+    # With google-re2 installed, intents are matched in one guaranteed
+    # linear-time pass; set indices follow INTENT_PATTERNS order
+    _INTENT_ORDER = tuple(INTENT_PATTERNS)
+    _RE2_SET = _build_re2_set(INTENT_PATTERNS.values())
+    
+    # Navigation action for each intent
+    _ACTION_MAP = {
+        NavigationIntent.DASHBOARD: "/dashboard",
+        NavigationIntent.CROP_DOCTOR: "/crop-doctor",
+        NavigationIntent.MARKET_ANALYST: "/market-analyst",
+        NavigationIntent.SCHEME_NAVIGATOR: "/scheme-navigator",
+        NavigationIntent.SOIL_ANALYSIS: "/soil-analysis",
+        NavigationIntent.WEATHER: "/dashboard#weather",
+        NavigationIntent.PROFILE: "/profile",
+        NavigationIntent.LANGUAGE_SELECT: "/language-select",
+        NavigationIntent.UNKNOWN: "",
+    }
+    
+    # Whole-word crop/commodity names, allowing plurals ("tomatoes");
+    # matched against lowercased text
+    _CROP_RX = re.compile(r"\b(tomato|wheat|rice|corn|potato|cotton)(?:es|s)?\b")
+    _COMMODITY_RX = re.compile(r"\b(wheat|rice|tomato|onion|potato)(?:es|s)?\b")
+    
+    def __init__(self, cache_size: int = 512, priority: Optional[List[NavigationIntent]] = None):
+        """Initialize the agent.
+        
+        Args:
+            cache_size: Number of normalized commands whose interpretation is memoized
+            priority: Intents to try first, most common first. The stdlib
+                matcher stops at the first intent that matches, so listing the
+                frequent intents first saves work; it also makes them win
+                when a command matches several intents.
+        """
+        if priority:
+            unknown = [intent for intent in priority if intent not in self.INTENT_PATTERNS]
+            if unknown:
+                raise ValueError(f"No patterns for intents: {unknown}")
+            ordered = dict.fromkeys(priority)
+            ordered.update(dict.fromkeys(self.INTENT_PATTERNS))
+            patterns = {intent: self.INTENT_PATTERNS[intent] for intent in ordered}
+            self._MASTER = _build_master(patterns)
+            self._INTENT_ORDER = tuple(patterns)
+            self._RE2_SET = _build_re2_set(patterns.values())
+        
+        self._interpret = lru_cache(maxsize=cache_size)(self._interpret_uncached)
+    
     def detect_intent(self, text: str) -> tuple[NavigationIntent, float]:
         """Detect navigation intent from transcribed text.
         
@@ -103,12 +200,17 @@ class VoiceNavigationAgent:
         Returns:
             Tuple of (intent, confidence_score)
         """
-        text_lower = text.lower()
+        text = text.lower()
+        
+        if self._RE2_SET is not None:
+            hits = self._RE2_SET.Match(text)
+            if hits:
+                return self._INTENT_ORDER[min(hits)], 0.9  # High confidence for pattern match
+            return NavigationIntent.UNKNOWN, 0.0
         
-        for intent, patterns in self.INTENT_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    return intent, 0.9  # High confidence for pattern match
+        match = self._MASTER.match(text)
+        if match:
+            return NavigationIntent[match.lastgroup], 0.9  # High confidence for pattern match
         
         return NavigationIntent.UNKNOWN, 0.0
     
@@ -123,23 +225,19 @@ class VoiceNavigationAgent:
             Dictionary of extracted parameters
         """
         params = {}
-        text_lower = text.lower()
+        text = text.lower()
         
         # Extract crop names for Crop Doctor
         if intent == NavigationIntent.CROP_DOCTOR:
-            crops = ["tomato", "wheat", "rice", "corn", "potato", "cotton"]
-            for crop in crops:
-                if crop in text_lower:
-                    params["crop"] = crop
-                    break
+            match = self._CROP_RX.search(text)
+            if match:
+                params["crop"] = match.group(1)
         
         # Extract commodity names for Market Analyst
         elif intent == NavigationIntent.MARKET_ANALYST:
-            commodities = ["wheat", "rice", "tomato", "onion", "potato"]
-            for commodity in commodities:
-                if commodity in text_lower:
-                    params["commodity"] = commodity
-                    break
+            match = self._COMMODITY_RX.search(text)
+            if match:
+                params["commodity"] = match.group(1)
         
         return params
     
@@ -152,31 +250,59 @@ class VoiceNavigationAgent:
         Returns:
             VoiceCommandResult with intent and action details
         """
-        intent, confidence = self.detect_intent(transcript)
-        parameters = self.extract_parameters(transcript, intent)
-        
-        # Generate action based on intent
-        action_map = {
-            NavigationIntent.DASHBOARD: "/dashboard",
-            NavigationIntent.CROP_DOCTOR: "/crop-doctor",
-            NavigationIntent.MARKET_ANALYST: "/market-analyst",
-            NavigationIntent.SCHEME_NAVIGATOR: "/scheme-navigator",
-            NavigationIntent.SOIL_ANALYSIS: "/soil-analysis",
-            NavigationIntent.WEATHER: "/dashboard#weather",
-            NavigationIntent.PROFILE: "/profile",
-            NavigationIntent.LANGUAGE_SELECT: "/language-select",
-            NavigationIntent.UNKNOWN: "",
-        }
-        
-        action = action_map.get(intent, "")
+        # Casing and whitespace never change the match, so repeated commands
+        # like "Go to  dashboard" hit the cache
+        key = " ".join(transcript.lower().split())
+        intent, confidence, action, parameters = self._interpret(key)
         
         return VoiceCommandResult(
             transcript=transcript,
             intent=intent,
             confidence=confidence,
             action=action,
-            parameters=parameters
+            parameters=dict(parameters)
         )
+    
+    def _interpret_uncached(self, text: str) -> tuple:
+        """Detect intent, parameters and action for a normalized command."""
+        intent, confidence = self.detect_intent(text)
+        parameters = self.extract_parameters(text, intent)
+        
+        # Generate action based on intent
+        action = self._ACTION_MAP.get(intent, "")
+        
+        return intent, confidence, action, tuple(parameters.items())
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available,
+    try_acquire() returns how long to wait instead of blocking."""
+    
+    def __init__(self, capacity: int, period_seconds: float):
+        self.capacity = capacity
+        self.rate = capacity / period_seconds
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+    
+    def acquire(self):
+        while (wait := self.try_acquire()) > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self):
+        while (wait := self.try_acquire()) > 0:
+            await asyncio.sleep(wait)
 
 
 class AudioTranscriber:
@@ -188,6 +314,24 @@ class AudioTranscriber:
     
     SUPPORTED_FORMATS = ['mp3', 'wav', 'flac', 'm4a', 'ogg']
     
+    # AssemblyAI allows 20,000 transcription requests per 5 minutes per account
+    RATE_LIMIT = (20000, 300)
+    
+    # Upper bound on transcriptions in flight at once across transcribe_many calls
+    MAX_CONCURRENT = 8
+    
+    # Shared by every instance in the process, since callers build a
+    # transcriber per request and the limits apply to the whole account
+    _rate_limiter = _TokenBucket(*RATE_LIMIT)
+    _concurrency = threading.BoundedSemaphore(MAX_CONCURRENT)
+    
+    # REST endpoint and status polling interval used by transcribe_async
+    API_BASE = "https://api.assemblyai.com/v2"
+    POLL_INTERVAL = 3.0
+    
+    # Audio is streamed to the upload endpoint in chunks of this size
+    UPLOAD_CHUNK_SIZE = 1 << 20
+    
     def __init__(self, api_key: Optional[str] = None):
         """Initialize the transcriber.
         
@@ -203,6 +347,29 @@ class AudioTranscriber:
         
         aai.settings.api_key = self.api_key
         self.navigation_agent = VoiceNavigationAgent()
+        
+        # One reusable Transcriber per language code (None = auto/default)
+        self._by_lang: Dict[Optional[str], aai.Transcriber] = {}
+        self._by_lang_lock = threading.Lock()
+        
+        # Keep-alive session for streaming uploads
+        self._session = requests.Session()
+        self._session.headers["authorization"] = self.api_key
+    
+    def _get_transcriber(self, language_code: Optional[str]) -> aai.Transcriber:
+        """Return the cached Transcriber for a language, creating it on first use."""
+        transcriber = self._by_lang.get(language_code)
+        if transcriber is None:
+            with self._by_lang_lock:
+                transcriber = self._by_lang.get(language_code)
+                if transcriber is None:
+                    config = aai.TranscriptionConfig(
+                        speech_model=aai.SpeechModel.best,
+                        language_code=language_code
+                    )
+                    transcriber = aai.Transcriber(config=config)
+                    self._by_lang[language_code] = transcriber
+        return transcriber
     
     def transcribe(self, audio_file: str, language_code: Optional[str] = None) -> str:
         """Transcribe an audio file to text.
@@ -218,6 +385,91 @@ class AudioTranscriber:
             RuntimeError: If transcription fails
             FileNotFoundError: If audio file doesn't exist
         """
+        self._validate_audio_file(audio_file)
+        
+        # Perform transcription; the SDK only polls since the audio is already uploaded
+        self._rate_limiter.acquire()
+        upload_url = self._upload(audio_file)
+        transcript = self._get_transcriber(language_code).transcribe(upload_url)
+        
+        if transcript.status == aai.TranscriptStatus.error:
+            raise RuntimeError(f"Transcription failed: {transcript.error}")
+        
+        return transcript.text
+    
+    async def transcribe_async(self, audio_file: str, language_code: Optional[str] = None) -> str:
+        """Transcribe an audio file without blocking the event loop.
+        
+        Uploads and polls through AssemblyAI's REST API with httpx, sleeping
+        between status checks instead of holding a worker thread.
+        
+        Args:
+            audio_file: Path to the audio file
+            language_code: Optional language code (e.g., 'en', 'hi', 'es')
+            
+        Returns:
+            Transcribed text
+            
+        Raises:
+            RuntimeError: If transcription fails
+            FileNotFoundError: If audio file doesn't exist
+        """
+        self._validate_audio_file(audio_file)
+        await self._rate_limiter.acquire_async()
+        
+        request = {"audio_url": None, "speech_model": "best"}
+        if language_code:
+            request["language_code"] = language_code
+        
+        async with httpx.AsyncClient(
+            base_url=self.API_BASE,
+            headers={"authorization": self.api_key},
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ) as client:
+            response = await client.post("/upload", content=self._aiter_audio(audio_file))
+            response.raise_for_status()
+            request["audio_url"] = response.json()["upload_url"]
+            
+            response = await client.post("/transcript", json=request)
+            response.raise_for_status()
+            transcript_id = response.json()["id"]
+            
+            while True:
+                response = await client.get(f"/transcript/{transcript_id}")
+                response.raise_for_status()
+                transcript = response.json()
+                if transcript["status"] == "completed":
+                    return transcript["text"]
+                if transcript["status"] == "error":
+                    raise RuntimeError(f"Transcription failed: {transcript.get('error')}")
+                await asyncio.sleep(self.POLL_INTERVAL)
+    
+    def transcribe_many(
+        self, audio_files: List[str], max_workers: int = 8, language_code: Optional[str] = None
+    ) -> List[str]:
+        """Transcribe several audio files concurrently.
+        
+        Args:
+            audio_files: Paths to the audio files
+            max_workers: Number of worker threads
+            language_code: Optional language code applied to every file
+            
+        Returns:
+            Transcribed text for each file, in input order
+            
+        Raises:
+            RuntimeError: If any transcription fails
+            FileNotFoundError: If any audio file doesn't exist
+        """
+        def run(audio_file: str) -> str:
+            with self._concurrency:
+                return self.transcribe(audio_file, language_code)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, audio_files))
+    
+    def _validate_audio_file(self, audio_file: str):
+        """Raise if the audio file is missing or in an unsupported format."""
         if not os.path.exists(audio_file):
             raise FileNotFoundError(f"Audio file not found: {audio_file}")
         
@@ -228,21 +480,27 @@ class AudioTranscriber:
                 f"Unsupported audio format: {file_ext}. "
                 f"Supported formats: {', '.join(self.SUPPORTED_FORMATS)}"
             )
+    
+    def _upload(self, audio_file: str) -> str:
+        """Stream an audio file to AssemblyAI and return its upload URL.
         
-        # Configure transcription
-        config = aai.TranscriptionConfig(
-            speech_model=aai.SpeechModel.best,
-            language_code=language_code
-        )
-        
-        # Perform transcription
-        transcriber = aai.Transcriber(config=config)
-        transcript = transcriber.transcribe(audio_file)
-        
-        if transcript.status == aai.TranscriptStatus.error:
-            raise RuntimeError(f"Transcription failed: {transcript.error}")
-        
-        return transcript.text
+        The file is sent in UPLOAD_CHUNK_SIZE pieces, so at most one chunk is
+        held in memory and sending starts before the whole file is read.
+        """
+        with open(audio_file, 'rb') as f:
+            response = self._session.post(
+                f"{self.API_BASE}/upload",
+                data=iter(partial(f.read, self.UPLOAD_CHUNK_SIZE), b""),
+                timeout=(5, 60),
+            )
+        response.raise_for_status()
+        return response.json()["upload_url"]
+    
+    async def _aiter_audio(self, audio_file: str):
+        """Yield an audio file in UPLOAD_CHUNK_SIZE pieces, reading off the event loop."""
+        with open(audio_file, 'rb') as f:
+            while chunk := await asyncio.to_thread(f.read, self.UPLOAD_CHUNK_SIZE):
+                yield chunk
     
     def transcribe_with_navigation(self, audio_file: str) -> VoiceCommandResult:
         """Transcribe audio and detect navigation intent.
@@ -286,7 +544,7 @@ def create_audio_transcriber(api_key: Optional[str] = None) -> AudioTranscriber:
 if __name__ == "__main__":
     # Demo usage
     logger.info("Voice Interaction Module Demo")
-    logger.info("" + ("=" * 50))
+    logger.info("=" * 50)
     
     # Test navigation agent with sample commands
     agent = VoiceNavigationAgent()
@@ -303,24 +561,24 @@ if __name__ == "__main__":
     logger.info("\nTesting voice command interpretation:")
     for command in test_commands:
         result = agent.process_command(command)
-        logger.info(f"\nCommand: {command}")
-        logger.info(f"Intent: {result.intent.value}")
-        logger.info(f"Action: {result.action}")
-        logger.info(f"Confidence: {result.confidence}")
+        logger.info("\nCommand: %s", command)
+        logger.info("Intent: %s", result.intent.value)
+        logger.info("Action: %s", result.action)
+        logger.info("Confidence: %s", result.confidence)
         if result.parameters:
-            logger.info(f"Parameters: {result.parameters}")
+            logger.info("Parameters: %s", result.parameters)
     
     # Test transcriber if audio file exists
     test_audio = os.path.join("uploads", "sample01.mp3")
     if os.path.exists(test_audio):
         try:
-            logger.info(f"\n\nTesting audio transcription with: {test_audio}")
+            logger.info("\n\nTesting audio transcription with: %s", test_audio)
             transcriber = create_audio_transcriber()
             result = transcriber.transcribe_with_navigation(test_audio)
-            logger.info(f"Transcript: {result.transcript}")
-            logger.info(f"Detected Intent: {result.intent.value}")
-            logger.info(f"Suggested Action: {result.action}")
+            logger.info("Transcript: %s", result.transcript)
+            logger.info("Detected Intent: %s", result.intent.value)
+            logger.info("Suggested Action: %s", result.action)
         except Exception as e:
-            logger.warning(f"Transcription test skipped: {e}")
+            logger.warning("Transcription test skipped: %s", e)
     else:
-        logger.info(f"\n\nSkipping audio transcription test (file not found: {test_audio})")
+        logger.info("\n\nSkipping audio transcription test (file not found: %s)", test_audio)
@@ -1,5 +1,6 @@
+import time
+from datetime import datetime, timezone
 from utils.logging import get_logger, log_exception, log_execution_time
-import pandas as pd
 import openmeteo_requests
 import requests_cache
 from retry_requests import retry
@@ -8,6 +9,11 @@ from access_location import access_location
 logger = get_logger(__name__)
 
 class WeatherService:
+    # Seconds to reuse a resolved location, matching the HTTP cache expiry
+    LOCATION_TTL = 3600
+    # Shared by every instance, since /api/weather builds a service per request
+    _location_cache = (0.0, None)  # (monotonic expiry, location)
+
     def __init__(self):
         """Initialize the weather service client."""
         self.cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
@@ -22,15 +28,15 @@ class WeatherService:
         Fetches weather data for a static location determined by the access_location service.
         """
         try:
-            location = access_location()
-            if not location or 'latitude' not in location or 'longitude' not in location:
+            location = self._get_location()
+            if location is None:
                 logger.error("Failed to get location from access_location service.")
                 return None
                 
             latitude = location['latitude']
             longitude = location['longitude']
             
-            logger.info(f"Fetching weather for static location: Lat {latitude}, Lon {longitude}")
+            logger.info("Fetching weather for static location: Lat %s, Lon %s", latitude, longitude)
 
             url = "https://api.open-meteo.com/v1/forecast"
             params = {
@@ -52,21 +58,24 @@ class WeatherService:
 
             hourly = response.Hourly()
             
-            # Process data into a DataFrame
-            hourly_data = {
-                "date": pd.to_datetime(hourly.Time(), unit="s", utc=True),
-                "temperature_2m": hourly.Variables(0).ValuesAsNumpy(),
-                "relative_humidity_2m": hourly.Variables(1).ValuesAsNumpy(),
-                "rain": hourly.Variables(2).ValuesAsNumpy(),
-            }
-            hourly_dataframe = pd.DataFrame(data=hourly_data)
-            
-            # Convert Timestamp objects to strings to prevent JSON serialization errors
-            hourly_dataframe['date'] = hourly_dataframe['date'].astype(str)
+            # Build records straight from the numpy columns; dates are
+            # stringified to prevent JSON serialization errors
+            start, interval = hourly.Time(), hourly.Interval()
+            temperature = hourly.Variables(0).ValuesAsNumpy().tolist()
+            humidity = hourly.Variables(1).ValuesAsNumpy().tolist()
+            rain = hourly.Variables(2).ValuesAsNumpy().tolist()
             
-            records = hourly_dataframe.to_dict(orient='records')
+            records = [
+                {
+                    "date": str(datetime.fromtimestamp(start + i * interval, timezone.utc)),
+                    "temperature_2m": t,
+                    "relative_humidity_2m": h,
+                    "rain": r,
+                }
+                for i, (t, h, r) in enumerate(zip(temperature, humidity, rain))
+            ]
 
-            logger.info(f"Successfully fetched {len(records)} weather records.")
+            logger.info("Successfully fetched %d weather records.", len(records))
             
             return {
                 "latitude": latitude,
@@ -75,9 +84,22 @@ class WeatherService:
             }
 
         except Exception as e:
-            logger.error(f"An unexpected error occurred in get_weather_for_static_location: {str(e)}")
+            logger.error("An unexpected error occurred in get_weather_for_static_location: %s", e)
             return None
 
+    def _get_location(self):
+        """Return the static location, resolving it at most once per LOCATION_TTL."""
+        expires, location = self._location_cache
+        if location is not None and time.monotonic() < expires:
+            return location
+
+        location = access_location()
+        if not location or 'latitude' not in location or 'longitude' not in location:
+            return None
+
+        WeatherService._location_cache = (time.monotonic() + self.LOCATION_TTL, location)
+        return location
+
 if __name__ == "__main__":
     service = WeatherService()
     weather_data = service.get_weather_for_static_location()
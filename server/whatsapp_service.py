@@ -1,17 +1,27 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from utils.logging import get_logger, log_exception, log_execution_time
 
 class WhatsAppService:
     """
     A service to send messages via the WhatsApp Business API.
     """
+    # Keep-alive session shared by every instance, so messages reuse the TLS
+    # connection to the Graph API even though callers build a service per request
+    _session = requests.Session()
+    _session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+
     def __init__(self):
         self.api_url = os.getenv('WHATSAPP_API_URL')
         self.phone_number_id = os.getenv('WHATSAPP_PHONE_NUMBER_ID')
         self.access_token = os.getenv('WHATSAPP_ACCESS_TOKEN')
         self.is_configured = all([self.api_url, self.phone_number_id, self.access_token])
         self.logger = get_logger(__name__)
+        self._headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/json'
+        }
 
     @log_exception()
     @log_execution_time()
@@ -31,10 +41,6 @@ class WhatsAppService:
             return {'error': 'WhatsApp service is not configured on the server.'}
 
         url = f"{self.api_url}/{self.phone_number_id}/messages"
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
         payload = {
             "messaging_product": "whatsapp",
             "to": to_phone_number,
@@ -43,16 +49,16 @@ class WhatsAppService:
         }
 
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
+            response = self._session.post(url, headers=self._headers, json=payload, timeout=10)
             response_data = response.json()
 
             if response.status_code != 200:
-                self.logger.error(f"WhatsApp API Error: {response_data}")
+                self.logger.error("WhatsApp API Error: %s", response_data)
                 return {'error': 'Failed to send message', 'details': response_data}
             
-            self.logger.info(f"WhatsApp message sent to {to_phone_number}")
+            self.logger.info("WhatsApp message sent to %s", to_phone_number)
             return {'status': 'Message sent successfully', 'details': response_data}
 
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"Error sending WhatsApp message: {str(e)}")
+            self.logger.error("Error sending WhatsApp message: %s", e)
             return {'error': f'An exception occurred: {str(e)}'}
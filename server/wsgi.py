@@ -0,0 +1,14 @@
+"""
+WSGI entrypoint for running the Kisan-G backend under a production server.
+
+Run from the ``server`` directory:
+
+    gunicorn --pythonpath .. -w 4 -k gthread --threads 8 -b 0.0.0.0:5001 wsgi:app
+
+Threaded workers let the blocking geolocation/scraper/weather I/O in the
+endpoints overlap instead of serializing on a single interpreter.
+"""
+
+from app import app
+
+__all__ = ['app']
@@ -4,23 +4,107 @@ Provides structured logging with file rotation, custom formatting,
 and multiple log levels for consistent logging across the application.
 """
 
+import atexit
+import copy
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
-import json
+import orjson
 import functools
+import time
 import traceback
 
+# (epoch second, formatted prefix) of the last timestamp rendered
+_ts_cache = (None, '')
+
+
+def _utc_iso(created: float, msecs: float) -> str:
+    """Render a record's epoch time as ISO-8601 UTC ('Z'), reusing the per-second prefix"""
+    global _ts_cache
+    second = int(created)
+    cached_second, prefix = _ts_cache
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _ts_cache = (second, prefix)
+    return f'{prefix}.{int(msecs):03d}Z'
+
+
+def _exception_signature(exc, tb, depth: int = 0):
+    """Build a traceback-cache key for an exception without referencing frames.
+    
+    Covers the exception type, message and notes, each frame's file, line,
+    function and last instruction (which decides the caret markers), and the
+    chained cause/context. Source text is read from linecache when formatting
+    and is assumed not to change while the process runs. Returns None when the
+    exception can't be summarized safely (exception groups, failing __str__,
+    non-string notes), in which case the caller should format without caching.
+    """
+    if exc is None or tb is None or isinstance(exc, BaseExceptionGroup) or depth > 8:
+        return None
+    try:
+        message = str(exc)
+    except Exception:
+        return None
+    notes = tuple(getattr(exc, '__notes__', None) or ())
+    if not all(isinstance(note, str) for note in notes):
+        return None
+    
+    frames = []
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        frames.append((code.co_filename, tb.tb_lineno, tb.tb_lasti, code.co_name))
+        tb = tb.tb_next
+    
+    chained = exc.__cause__
+    if chained is None and not exc.__suppress_context__:
+        chained = exc.__context__
+    chained_signature = None
+    if chained is not None:
+        chained_signature = _exception_signature(chained, chained.__traceback__, depth + 1)
+        if chained_signature is None:
+            return None
+    return (type(exc), message, notes, tuple(frames), chained_signature)
+
 
 class StructuredFormatter(logging.Formatter):
     """Custom formatter for structured logging output."""
     
+    def __init__(self, *args, traceback_cache_size: int = 128, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Exception signature -> rendered text. Signatures hold only strings
+        # and line numbers, never frames, so cached entries keep no locals alive.
+        self._tb_cache: OrderedDict = OrderedDict()
+        self._tb_cache_size = traceback_cache_size
+        self._tb_lock = threading.Lock()
+    
+    def formatException(self, ei) -> str:
+        """Format exc_info, reusing the text when an identical traceback is logged again."""
+        key = _exception_signature(ei[1], ei[2])
+        if key is None:
+            return super().formatException(ei)
+        
+        with self._tb_lock:
+            text = self._tb_cache.get(key)
+            if text is not None:
+                self._tb_cache.move_to_end(key)
+                return text
+        
+        text = super().formatException(ei)
+        with self._tb_lock:
+            self._tb_cache[key] = text
+            if len(self._tb_cache) > self._tb_cache_size:
+                self._tb_cache.popitem(last=False)
+        return text
+    
     def format(self, record: logging.LogRecord) -> str:
+        attrs = record.__dict__
         log_data = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': _utc_iso(record.created, record.msecs),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -32,13 +116,30 @@ class StructuredFormatter(logging.Formatter):
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
         
-        # Add custom fields if present
-        if hasattr(record, 'user_id'):
-            log_data['user_id'] = record.user_id
-        if hasattr(record, 'request_id'):
-            log_data['request_id'] = record.request_id
+        # Add custom fields if present; plain dict lookups instead of hasattr
+        if 'user_id' in attrs:
+            log_data['user_id'] = attrs['user_id']
+        if 'request_id' in attrs:
+            log_data['request_id'] = attrs['request_id']
             
-        return json.dumps(log_data)
+        return orjson.dumps(log_data, default=str).decode()
+
+
+class _LocalQueueHandler(QueueHandler):
+    """QueueHandler for an in-process listener.
+    
+    The stock prepare() pre-formats the record and drops exc_info, which would
+    fold tracebacks into the message and lose StructuredFormatter's exception
+    field. Here only the message is resolved, so later changes to mutable args
+    cannot alter it.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
 
 
 class AppLogger:
@@ -90,7 +191,6 @@ class AppLogger:
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(console_format)
-        root_logger.addHandler(file_handler)
         
         # Error file handler for ERROR and CRITICAL logs
         error_handler = RotatingFileHandler(
@@ -100,7 +200,6 @@ class AppLogger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(console_format)
-        root_logger.addHandler(error_handler)
         
         # Structured JSON log handler
         json_handler = TimedRotatingFileHandler(
@@ -111,7 +210,16 @@ class AppLogger:
         )
         json_handler.setLevel(logging.INFO)
         json_handler.setFormatter(StructuredFormatter())
-        root_logger.addHandler(json_handler)
+        
+        # File handlers run on a listener thread; callers only enqueue records
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(_LocalQueueHandler(log_queue))
+        self._listener = QueueListener(
+            log_queue, file_handler, error_handler, json_handler,
+            respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
     
     def get_logger(self, name: str) -> logging.Logger:
         """Get or create a logger with the given name.
@@ -170,15 +278,17 @@ def log_exception(logger: Optional[logging.Logger] = None):
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                logger.error(
-                    f"Exception in {func.__name__}: {str(e)}",
-                    exc_info=True,
-                    extra={
-                        'function': func.__name__,
-                        'args': str(args)[:200],  # Limit length
-                        'kwargs': str(kwargs)[:200]
-                    }
-                )
+                # Only pay for the argument reprs when the record is emitted
+                if logger.isEnabledFor(logging.ERROR):
+                    logger.error(
+                        "Exception in %s: %s", func.__name__, e,
+                        exc_info=True,
+                        extra={
+                            'function': func.__name__,
+                            'call_args': str(args)[:200],  # Limit length
+                            'call_kwargs': str(kwargs)[:200]
+                        }
+                    )
                 raise
         return wrapper
     return decorator
@@ -203,20 +313,19 @@ def log_execution_time(logger: Optional[logging.Logger] = None, level: int = log
             if logger is None:
                 logger = get_logger(func.__module__)
             
-            start_time = datetime.now()
+            # Skip timing entirely when neither message could be emitted
+            if not logger.isEnabledFor(max(level, logging.ERROR)):
+                return func(*args, **kwargs)
+            
+            start_time = time.perf_counter()
             try:
                 result = func(*args, **kwargs)
-                execution_time = (datetime.now() - start_time).total_seconds()
-                logger.log(
-                    level,
-                    f"{func.__name__} executed in {execution_time:.3f}s"
-                )
+                execution_time = time.perf_counter() - start_time
+                logger.log(level, "%s executed in %.3fs", func.__name__, execution_time)
                 return result
             except Exception:
-                execution_time = (datetime.now() - start_time).total_seconds()
-                logger.error(
-                    f"{func.__name__} failed after {execution_time:.3f}s"
-                )
+                execution_time = time.perf_counter() - start_time
+                logger.error("%s failed after %.3fs", func.__name__, execution_time)
                 raise
         return wrapper
     return decorator
@@ -232,22 +341,22 @@ class RequestLogger:
         self.start_time = None
     
     def __enter__(self):
-        self.start_time = datetime.now()
-        self.logger.info(f"Request started: {self.method} {self.endpoint}")
+        self.start_time = time.perf_counter()
+        self.logger.info("Request started: %s %s", self.method, self.endpoint)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        execution_time = (datetime.now() - self.start_time).total_seconds()
+        execution_time = time.perf_counter() - self.start_time
         
         if exc_type is None:
             self.logger.info(
-                f"Request completed: {self.method} {self.endpoint} "
-                f"({execution_time:.3f}s)"
+                "Request completed: %s %s (%.3fs)",
+                self.method, self.endpoint, execution_time
             )
         else:
             self.logger.error(
-                f"Request failed: {self.method} {self.endpoint} "
-                f"({execution_time:.3f}s) - {exc_val}",
+                "Request failed: %s %s (%.3fs) - %s",
+                self.method, self.endpoint, execution_time, exc_val,
                 exc_info=True
             )
         return False  # Don't suppress exceptions